@@ -0,0 +1,45 @@
+"""store attachment contents as large objects
+
+Revision ID: 2b3c4d5e6f7a
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-14 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '2b3c4d5e6f7a'
+down_revision = '1a2b3c4d5e6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('post_attachments', sa.Column('data_oid', postgresql.OID(), nullable=True))
+    op.execute("UPDATE post_attachments SET data_oid = lo_from_bytea(0, data)")
+    op.alter_column('post_attachments', 'data_oid', nullable=False)
+    op.drop_column('post_attachments', 'data')
+
+    # large objects are not removed with their row
+    op.execute(
+        "CREATE OR REPLACE FUNCTION post_attachments_unlink_data() RETURNS trigger AS $$ "
+        "BEGIN PERFORM lo_unlink(OLD.data_oid); RETURN OLD; END; $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER post_attachments_unlink_data AFTER DELETE ON post_attachments "
+        "FOR EACH ROW EXECUTE FUNCTION post_attachments_unlink_data()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS post_attachments_unlink_data ON post_attachments")
+    op.execute("DROP FUNCTION IF EXISTS post_attachments_unlink_data()")
+
+    op.add_column('post_attachments', sa.Column('data', sa.LargeBinary(), nullable=True))
+    op.execute("UPDATE post_attachments SET data = lo_get(data_oid)")
+    op.execute("SELECT lo_unlink(data_oid) FROM post_attachments")
+    op.alter_column('post_attachments', 'data', nullable=False)
+    op.drop_column('post_attachments', 'data_oid')
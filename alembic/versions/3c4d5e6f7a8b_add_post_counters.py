@@ -0,0 +1,66 @@
+"""add trigger-maintained view/reply/share counters to posts
+
+Revision ID: 3c4d5e6f7a8b
+Revises: 2b3c4d5e6f7a
+Create Date: 2026-10-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c4d5e6f7a8b'
+down_revision = '2b3c4d5e6f7a'
+branch_labels = None
+depends_on = None
+
+
+COUNTERS = (
+    ('post_views', 'views_count'),
+    ('post_replies', 'replies_count'),
+    ('post_shares', 'shares_count'),
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, column in COUNTERS:
+        op.add_column('posts', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+        # replies/shares tables come from create_all, which installs the trigger itself
+        if not inspector.has_table(table):
+            continue
+        op.execute(
+            f"UPDATE posts SET {column} = c.n "
+            f"FROM (SELECT post_id, count(*) AS n FROM {table} GROUP BY post_id) AS c "
+            f"WHERE posts.id = c.post_id"
+        )
+        # statement-level: one grouped UPDATE per INSERT/DELETE statement, not one per row
+        op.execute(
+            f"CREATE OR REPLACE FUNCTION {table}_count() RETURNS trigger AS $$ "
+            f"BEGIN "
+            f"IF TG_OP = 'INSERT' THEN "
+            f"UPDATE posts SET {column} = {column} + c.n "
+            f"FROM (SELECT post_id, count(*) AS n FROM new_rows GROUP BY post_id) AS c WHERE posts.id = c.post_id; "
+            f"ELSE "
+            f"UPDATE posts SET {column} = {column} - c.n "
+            f"FROM (SELECT post_id, count(*) AS n FROM old_rows GROUP BY post_id) AS c WHERE posts.id = c.post_id; "
+            f"END IF; RETURN NULL; END; $$ LANGUAGE plpgsql"
+        )
+        # transition tables need single-event triggers
+        op.execute(
+            f"CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table} "
+            f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {table}_count()"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table} "
+            f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION {table}_count()"
+        )
+
+
+def downgrade() -> None:
+    for table, column in reversed(COUNTERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_count_insert ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_count_delete ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_count()")
+        op.drop_column('posts', column)
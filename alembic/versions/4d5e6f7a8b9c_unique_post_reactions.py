@@ -0,0 +1,32 @@
+"""unique reaction per user, post and (case-insensitive) kind
+
+Revision ID: 4d5e6f7a8b9c
+Revises: 3c4d5e6f7a8b
+Create Date: 2026-10-14 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4d5e6f7a8b9c'
+down_revision = '3c4d5e6f7a8b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # keep the oldest of any duplicates that slipped in before the index existed
+    op.execute(
+        'DELETE FROM post_reactions a USING post_reactions b '
+        'WHERE a.post_id = b.post_id AND a."user" = b."user" '
+        'AND lower(a.reaction) = lower(b.reaction) AND a.id > b.id'
+    )
+    op.execute(
+        'CREATE UNIQUE INDEX uq_post_reactions_post_user_reaction '
+        'ON post_reactions (post_id, "user", lower(reaction))'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_post_reactions_post_user_reaction', table_name='post_reactions')
@@ -1,20 +1,33 @@
+import sys
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 # Minimal Vercel entrypoint: do NOT import `app.main` here.
 # This file must define `app` and avoid indirect imports that pull in
 # vendored packages before Vercel installs requirements.
 
-from app.routes.posts import router as posts_router
-from app.routes.documents import router as documents_router
+# Full app already imported in this process: reuse it instead of
+# building (and importing routers for) a second one
+_loaded_app = getattr(sys.modules.get("app.main"), "app", None)
 
-app = FastAPI(title="Intranet API (Vercel)")
+if _loaded_app is not None:
+	app = _loaded_app
+else:
+	from app.routes.posts import router as posts_router
+	from app.routes.documents import router as documents_router
 
-# Include routers from the app package
-app.include_router(posts_router)
-app.include_router(documents_router)
+	from app import view_buffer
+	from app.security import close_http_client
 
+	app = FastAPI(title="Intranet API (Vercel)", default_response_class=ORJSONResponse)
+	app.add_event_handler("shutdown", view_buffer.stop)
+	app.add_event_handler("shutdown", close_http_client)
 
-@app.get("/")
-def _root():
-	return {"status": "running"}
+	# Include routers from the app package
+	app.include_router(posts_router)
+	app.include_router(documents_router)
 
+	@app.get("/")
+	def _root():
+		return {"status": "running"}
@@ -1,5 +1,8 @@
+import sys
+from dataclasses import dataclass
+from typing import FrozenSet
+
 from decouple import config
-from typing import List
 
 # Database Configuration - Use DATABASE_URL directly from .env
 DATABASE_URL = config(
@@ -9,15 +12,28 @@ DATABASE_URL = config(
 
 # FastAPI Configuration
 APP_NAME = config("APP_NAME", default="Intranet API")
-APP_DEBUG = config("APP_DEBUG", default=True, cast=bool)
+APP_DEBUG = config("APP_DEBUG", default=False, cast=bool)
 APP_PORT = config("APP_PORT", default=8000, cast=int)
 APP_HOST = config("APP_HOST", default="0.0.0.0")
 
+# Database pool Configuration
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=20, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=40, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=int)
+# Set when DATABASE_URL points at a transaction-mode PgBouncer (pooling happens there)
+DB_USE_PGBOUNCER = config("DB_USE_PGBOUNCER", default=False, cast=bool)
+# Statement logging is opt-in even in debug mode
+SQL_ECHO = config("SQL_ECHO", default=False, cast=bool)
+
 # CORS Configuration
-ALLOWED_ORIGINS: List[str] = config(
+# A frozenset so CORSMiddleware's `origin in allow_origins` is a hash lookup
+# rather than a scan on every preflight
+_ALLOWED_ORIGINS_RAW = config(
     "ALLOWED_ORIGINS",
-    default="https://intranet-eight-iota.vercel.app,https://intranet-cm4p.vercel.app,http://localhost:5173",
-    cast=lambda x: [url.strip() for url in x.split(",")]
+    default="https://intranet-eight-iota.vercel.app,https://intranet-cm4p.vercel.app,http://localhost:5173"
+)
+ALLOWED_ORIGINS: FrozenSet[str] = frozenset(
+    sys.intern(url.strip()) for url in _ALLOWED_ORIGINS_RAW.split(",") if url.strip()
 )
 
 # Microsoft OAuth (placeholders; set real values in .env)
@@ -26,25 +42,29 @@ MS_CLIENT_SECRET = config("MS_CLIENT_SECRET", default="YOUR_MS_CLIENT_SECRET")
 MS_TENANT_ID = config("MS_TENANT_ID", default="YOUR_TENANT_ID")
 MS_REDIRECT_URI = config("MS_REDIRECT_URI", default="http://localhost:5173/login")
 MS_SCOPE = config("MS_SCOPE", default="openid profile email offline_access User.Read")
-MS_TOKEN_URL = config(
-    "MS_TOKEN_URL",
-    default=None,
-    cast=lambda v: v or f"https://login.microsoftonline.com/{MS_TENANT_ID}/oauth2/v2.0/token"
+MS_TOKEN_URL = (
+    config("MS_TOKEN_URL", default="")
+    or f"https://login.microsoftonline.com/{MS_TENANT_ID}/oauth2/v2.0/token"
 )
-MS_AUTH_URL = config(
-    "MS_AUTH_URL",
-    default=None,
-    cast=lambda v: v or f"https://login.microsoftonline.com/{MS_TENANT_ID}/oauth2/v2.0/authorize"
+MS_AUTH_URL = (
+    config("MS_AUTH_URL", default="")
+    or f"https://login.microsoftonline.com/{MS_TENANT_ID}/oauth2/v2.0/authorize"
 )
 
-# App Settings
+# App Settings (read-only once loaded)
+@dataclass(slots=True, frozen=True)
 class Settings:
     database_url: str = DATABASE_URL
     app_name: str = APP_NAME
     debug: bool = APP_DEBUG
+    db_pool_size: int = DB_POOL_SIZE
+    db_max_overflow: int = DB_MAX_OVERFLOW
+    db_pool_timeout: int = DB_POOL_TIMEOUT
+    db_use_pgbouncer: bool = DB_USE_PGBOUNCER
+    sql_echo: bool = SQL_ECHO
     port: int = APP_PORT
     host: str = APP_HOST
-    allowed_origins: List[str] = ALLOWED_ORIGINS
+    allowed_origins: FrozenSet[str] = ALLOWED_ORIGINS
     ms_client_id: str = MS_CLIENT_ID
     ms_client_secret: str = MS_CLIENT_SECRET
     ms_tenant_id: str = MS_TENANT_ID
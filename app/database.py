@@ -1,36 +1,100 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import os
+from uuid import uuid4
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 from app.config import settings
 
-# Create database engine with SSL and connection pooling settings
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,  # Test connections before using them
-    pool_recycle=300,  # Recycle connections after 5 minutes
-    connect_args={
-        "sslmode": "require",
-        "connect_timeout": 10,
-        "keepalives": 1,
-        "keepalives_idle": 30,
-        "keepalives_interval": 10,
-        "keepalives_count": 5,
+# Ports/host markers used by managed PgBouncer poolers (e.g. Supabase on 6543)
+PGBOUNCER_PORTS = {6432, 6543}
+PGBOUNCER_HOST_MARKERS = ("pgbouncer", "pooler")
+
+
+def _async_database_url(url: str) -> str:
+    """Point a plain postgresql:// URL (as found in .env) at the asyncpg driver"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# libpq connection-string options that asyncpg.connect() doesn't accept as keywords
+LIBPQ_ONLY_PARAMS = (
+    "keepalives",
+    "keepalives_idle",
+    "keepalives_interval",
+    "keepalives_count",
+    "channel_binding",
+    "gssencmode",
+)
+
+
+def _translate_libpq_params(url, connect_args: dict):
+    """Move libpq-style query options (sslmode=require etc.) into asyncpg connect_args.
+
+    The asyncpg dialect hands every query parameter to asyncpg.connect(), which
+    rejects libpq-only names like sslmode or connect_timeout.
+    """
+    query = dict(url.query)
+    if "sslmode" in query:
+        connect_args["ssl"] = query.pop("sslmode")
+    if "connect_timeout" in query:
+        connect_args["timeout"] = int(query.pop("connect_timeout"))
+    if "application_name" in query:
+        connect_args.setdefault("server_settings", {})["application_name"] = query.pop("application_name")
+    for name in LIBPQ_ONLY_PARAMS:
+        query.pop(name, None)
+    return url.set(query=query)
+
+
+def _uses_pgbouncer(url) -> bool:
+    if settings.db_use_pgbouncer:
+        return True
+    host = (url.host or "").lower()
+    return url.port in PGBOUNCER_PORTS or any(m in host for m in PGBOUNCER_HOST_MARKERS)
+
+
+connect_args = {
+    "ssl": "require",
+    "timeout": 10,
+}
+database_url = _translate_libpq_params(make_url(_async_database_url(settings.database_url)), connect_args)
+
+if _uses_pgbouncer(database_url):
+    # Transaction-mode bouncers pool server connections themselves and can't keep
+    # prepared statements across transactions, so hold no local pool or statement caches
+    database_url = database_url.update_query_dict({"prepared_statement_cache_size": "0"})
+    connect_args["statement_cache_size"] = 0
+    # The dialect still prepares each statement; unique names keep them from colliding
+    # with other clients' __asyncpg_stmt_N__ on a shared server connection
+    connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    pool_args = {"poolclass": NullPool}
+else:
+    pool_args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": True,  # Test connections before using them
+        "pool_recycle": 300,  # Recycle connections after 5 minutes
     }
+
+# Create async database engine with SSL and connection pooling settings
+engine = create_async_engine(
+    database_url,
+    # never log statements on Vercel, whatever the debug flags say
+    echo=False if os.getenv("VERCEL") else settings.debug and settings.sql_echo,
+    connect_args=connect_args,
+    **pool_args,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory (objects stay usable after commit, no lazy reload needed)
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 # Create declarative base
 Base = declarative_base()
 
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
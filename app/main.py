@@ -1,21 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.config import settings
+from app import view_buffer
 from app.database import Base, engine
+from app.security import close_http_client
 from app.routes import documents
 from app.routes import posts
 from app.routes import auth
 from app.routes import me
 
-# Create all database tables
-Base.metadata.create_all(bind=engine)
-
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     debug=settings.debug,
     version="1.0.0",
-    description="HR Policies Management API"
+    description="HR Policies Management API",
+    # orjson encodes the (large) post lists much faster than the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -27,6 +29,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Create all database tables (async engine, so this has to run on the event loop)
+@app.on_event("startup")
+async def create_tables():
+    """Create all database tables"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+@app.on_event("shutdown")
+async def flush_view_buffer():
+    """Write out views still buffered in this process and close the shared HTTP client"""
+    try:
+        await view_buffer.stop()
+    finally:
+        await close_http_client()
+
 # Include routes
 app.include_router(documents.router)
 app.include_router(posts.router)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, LargeBinary, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, DDL, Index, event
+from sqlalchemy.dialects.postgresql import OID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -6,6 +7,8 @@ from app.database import Base
 
 class Post(Base):
     __tablename__ = "posts"
+    # fetch server-generated timestamps/counters via RETURNING on flush instead of a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -14,17 +17,27 @@ class Post(Base):
     announce_type = Column(String(50), nullable=True)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    # denormalized child counts, maintained by triggers on the child tables
+    views_count = Column(Integer, nullable=False, server_default="0")
+    replies_count = Column(Integer, nullable=False, server_default="0")
+    shares_count = Column(Integer, nullable=False, server_default="0")
 
     # relationships
     attachments = relationship("Attachment", back_populates="post", cascade="all, delete-orphan")
     reactions = relationship("Reaction", back_populates="post", cascade="all, delete-orphan")
-    views = relationship("PostView", back_populates="post", cascade="all, delete-orphan")
+    views = relationship(
+        "PostView",
+        back_populates="post",
+        cascade="all, delete-orphan",
+        order_by="(PostView.viewed_at, PostView.id)",
+    )
     replies = relationship("Reply", back_populates="post", cascade="all, delete-orphan")
     shares = relationship("Share", back_populates="post", cascade="all, delete-orphan")
 
 
 class Attachment(Base):
     __tablename__ = "post_attachments"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -32,12 +45,33 @@ class Attachment(Base):
     content_type = Column(String(120), nullable=False)
     size = Column(Integer, nullable=False)
     is_image = Column(Boolean, default=False)
-    data = Column(LargeBinary, nullable=False)
+    # file contents live in a Postgres large object so they can be written/read in chunks
+    data_oid = Column(OID, nullable=False)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
 
     post = relationship("Post", back_populates="attachments")
 
 
+# Large objects outlive their row unless unlinked; same trigger as the
+# attachments-large-objects migration, for databases built with create_all
+event.listen(
+    Attachment.__table__,
+    "after_create",
+    DDL(
+        "CREATE OR REPLACE FUNCTION post_attachments_unlink_data() RETURNS trigger AS $$ "
+        "BEGIN PERFORM lo_unlink(OLD.data_oid); RETURN OLD; END; $$ LANGUAGE plpgsql"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Attachment.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER post_attachments_unlink_data AFTER DELETE ON post_attachments "
+        "FOR EACH ROW EXECUTE FUNCTION post_attachments_unlink_data()"
+    ).execute_if(dialect="postgresql"),
+)
+
+
 class Reaction(Base):
     __tablename__ = "post_reactions"
 
@@ -50,6 +84,12 @@ class Reaction(Base):
     post = relationship("Post", back_populates="reactions")
 
 
+# One reaction of each kind (case-insensitive) per user and post; also the
+# ON CONFLICT target for inserts
+REACTION_UNIQUE_ELEMENTS = (Reaction.post_id, Reaction.user, func.lower(Reaction.reaction))
+Index("uq_post_reactions_post_user_reaction", *REACTION_UNIQUE_ELEMENTS, unique=True)
+
+
 class PostView(Base):
     __tablename__ = "post_views"
 
@@ -83,3 +123,39 @@ class Share(Base):
     created_at = Column(DateTime, nullable=False, server_default=func.now())
 
     post = relationship("Post", back_populates="shares")
+
+
+def _post_counter_ddl(table: str, column: str):
+    """Statement-level triggers keeping posts.<column> in step with inserts/deletes on <table>.
+
+    One grouped UPDATE per statement (not one per row), so a batch of N rows
+    touches each post once. Postgres allows transition tables only on
+    single-event triggers, hence separate INSERT and DELETE triggers.
+    """
+    return (
+        DDL(
+            f"CREATE OR REPLACE FUNCTION {table}_count() RETURNS trigger AS $$ "
+            f"BEGIN "
+            f"IF TG_OP = 'INSERT' THEN "
+            f"UPDATE posts SET {column} = {column} + c.n "
+            f"FROM (SELECT post_id, count(*) AS n FROM new_rows GROUP BY post_id) AS c WHERE posts.id = c.post_id; "
+            f"ELSE "
+            f"UPDATE posts SET {column} = {column} - c.n "
+            f"FROM (SELECT post_id, count(*) AS n FROM old_rows GROUP BY post_id) AS c WHERE posts.id = c.post_id; "
+            f"END IF; RETURN NULL; END; $$ LANGUAGE plpgsql"
+        ),
+        DDL(
+            f"CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table} "
+            f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {table}_count()"
+        ),
+        DDL(
+            f"CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table} "
+            f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION {table}_count()"
+        ),
+    )
+
+
+# Same triggers as the post-counters migration, for databases built with create_all
+for _model, _column in ((PostView, "views_count"), (Reply, "replies_count"), (Share, "shares_count")):
+    for _ddl in _post_counter_ddl(_model.__tablename__, _column):
+        event.listen(_model.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
@@ -1,31 +1,27 @@
+import logging
 from uuid import uuid4
 from fastapi import APIRouter, HTTPException, Depends, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import MicrosoftExchangeRequest, TokenResponse
-from app.security import validate_microsoft_id_token, create_tokens
+from app.security import validate_microsoft_id_token, create_tokens, invalidate_cached_user
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
+logger = logging.getLogger(__name__)
 
 
 @router.post("/microsoft/exchange", response_model=TokenResponse)
 async def exchange_microsoft_token(
     payload: MicrosoftExchangeRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Exchange Microsoft ID token for Intranet JWT"""
-    # Log incoming id_token for testing (do NOT do this in production)
-    try:
-        print("[auth.exchange] received id_token:", payload.id_token[:100] + '...')
-    except Exception:
-        print("[auth.exchange] received id_token (unable to print)")
-
-    # Also log Authorization header if present
-    # (Request can be injected to inspect raw headers)
-    # NOTE: printing tokens is only for local testing/debugging
-    # and must be removed before deploying to production.
+    logger.debug("exchange: received id_token (%d chars)", len(payload.id_token))
+
     # Validate the Microsoft ID token
     claims = await validate_microsoft_id_token(payload.id_token)
 
@@ -35,18 +31,20 @@ async def exchange_microsoft_token(
     if not email:
         raise HTTPException(status_code=400, detail="Invalid Microsoft token")
 
-    user = db.query(User).filter(User.email == email).first()
+    # Create the user on first sign-in, otherwise refresh its display name:
+    # one round-trip either way
+    stmt = insert(User).values(id=str(uuid4()), email=email, name=name)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.email],
+        set_={"name": func.coalesce(stmt.excluded.name, User.name)},
+    ).returning(User.id)
+    user_id = (await db.execute(stmt)).scalar_one()
+    await db.commit()
 
-    if not user:
-        user = User(
-            id=str(uuid4()),
-            email=email,
-            name=name,
-        )
-        db.add(user)
-        db.commit()
+    # sign-in may follow a profile change; don't serve a stale cached copy
+    invalidate_cached_user(user_id)
 
-    access_token, refresh_token = create_tokens(user.id)
+    access_token, refresh_token = create_tokens(user_id)
 
     return {
         "access_token": access_token,
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.security import INTRANET_SECRET_KEY, ALGORITHM
+from app.security import decode_access_token, get_cached_user, cache_user
 from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import UserResponse
@@ -12,26 +12,27 @@ router = APIRouter(tags=["user"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> UserResponse:
     """Get current user from JWT token"""
     try:
-        payload = jwt.decode(token, INTRANET_SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        user_id = decode_access_token(token)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = get_cached_user(user_id)
+    if user is not None:
+        return user
+
+    user = await db.scalar(select(User).where(User.id == user_id))
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
+    return cache_user(user)
 
 
 @router.get("/api/me", response_model=UserResponse)
-def me(user: User = Depends(get_current_user)):
+async def me(user: UserResponse = Depends(get_current_user)):
     """Get current user info"""
     return {
         "id": user.id,
@@ -1,20 +1,91 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload, defer
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, func, select, literal, BigInteger, LargeBinary
+from sqlalchemy.dialects.postgresql import OID, insert
+from sqlalchemy.exc import IntegrityError
+from app import view_buffer
 from app.database import get_db
-from app.models.post import Post, Attachment, Reaction, PostView
+from app.models.post import Post, Attachment, Reaction, PostView, REACTION_UNIQUE_ELEMENTS
 from app.schemas.post import PostCreate, PostResponse, PostListResponse, PostUpdate, AttachmentMeta, ReactionSchema, ReplySchema, ShareSchema
 from app.models.post import Reply, Share
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 
 router = APIRouter(prefix="/api/posts", tags=["posts"])
+logger = logging.getLogger(__name__)
 
 # Bearer auth extractor (optional, auto_error=False to allow anonymous requests)
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# Attachments are streamed back in slices of this size instead of loading the file whole
+ATTACHMENT_CHUNK_SIZE = 64 * 1024
+# Uploads are copied into the attachment's large object in pieces of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# SQLSTATE raised when a child row points at a post that doesn't exist
+FOREIGN_KEY_VIOLATION = "23503"
+
+# Load the sibling collections with one "WHERE post_id IN (...)" query each rather
+# than joining them (a join multiplies attachments x reactions x views rows per post)
+POST_COLLECTION_OPTIONS = (
+    # only the AttachmentMeta columns; the contents are fetched by get_attachment
+    selectinload(Post.attachments).load_only(
+        Attachment.id,
+        Attachment.post_id,
+        Attachment.filename,
+        Attachment.content_type,
+        Attachment.size,
+        Attachment.is_image,
+        Attachment.created_at,
+    ),
+    selectinload(Post.reactions),
+    selectinload(Post.views).load_only(PostView.id, PostView.user, PostView.viewed_at),
+)
+# What update_post answers with: no seen_by, so every post_views row would be wasted
+POST_EDIT_OPTIONS = POST_COLLECTION_OPTIONS[:2]
+
+
+async def _get_post(db: AsyncSession, post_id: int) -> Optional[Post]:
+    return await db.scalar(select(Post).where(Post.id == post_id))
+
+
+def _is_missing_post(exc: IntegrityError) -> bool:
+    """True when the insert failed on the post_id foreign key (the post doesn't exist)"""
+    return getattr(exc.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION
+
+
+async def _get_post_with_collections(db: AsyncSession, post_id: int, options=POST_COLLECTION_OPTIONS) -> Optional[Post]:
+    # populate_existing: the post may already sit in the identity map from this request
+    return await db.scalar(
+        select(Post)
+        .options(*options)
+        .where(Post.id == post_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def _add_attachment(db: AsyncSession, post_id: int, f: UploadFile) -> Attachment:
+    """Copy an upload into a new large object chunk by chunk (never the whole file in memory)"""
+    oid = await db.scalar(select(func.lo_create(literal(0, OID), type_=OID)))
+    size = 0
+    while chunk := await f.read(UPLOAD_CHUNK_SIZE):
+        await db.execute(select(func.lo_put(literal(oid, OID), literal(size, BigInteger), chunk)))
+        size += len(chunk)
+    att = Attachment(
+        post_id=post_id,
+        filename=f.filename,
+        content_type=f.content_type or 'application/octet-stream',
+        size=size,
+        is_image=(f.content_type or '').startswith('image/'),
+        data_oid=oid,
+    )
+    db.add(att)
+    return att
+
 
 @router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
@@ -23,41 +94,20 @@ async def create_post(
     author: str = Form(...),
     announce_type: Optional[str] = Form(None),
     files: Optional[List[UploadFile]] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
 ):
     """Create a post with optional attachments (multipart/form-data). Files are stored in DB."""
     post = Post(title=title, description=description, author=author, announce_type=announce_type)
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    # flush for post.id; timestamps come back in the same INSERT ... RETURNING
+    await db.flush()
 
     # handle files
-    if files:
-        for f in files:
-            content = await f.read()
-            att = Attachment(
-                post_id=post.id,
-                filename=f.filename,
-                content_type=f.content_type or 'application/octet-stream',
-                size=len(content),
-                is_image=(f.content_type or '').startswith('image/'),
-                data=content,
-            )
-            db.add(att)
-        db.commit()
-
-    # eager load relations
-    db.refresh(post)
-    # compute views_count
-    views_count = db.query(PostView).filter(PostView.post_id == post.id).count()
-
-    # Log bearer token for testing (do NOT keep in production)
-    try:
-        token = credentials.credentials if credentials else None
-        print(f"[posts.create_post] Authorization Bearer token: {token}")
-    except Exception:
-        print("[posts.create_post] no bearer token found")
+    attachments = [await _add_attachment(db, post.id, f) for f in files or []]
+    await db.commit()
+
+    logger.debug("create_post: bearer token %s", "present" if credentials else "absent")
 
     return PostResponse(
         id=post.id,
@@ -67,69 +117,54 @@ async def create_post(
         announce_type=post.announce_type,
         created_at=post.created_at,
         updated_at=post.updated_at,
-        attachments=[AttachmentMeta.from_orm(a) for a in post.attachments],
+        attachments=[AttachmentMeta.from_orm(a) for a in attachments],
         reactions=[],
-        views_count=views_count,
+        views_count=post.views_count,
     )
 
 
 @router.get("/", response_model=PostListResponse)
-def list_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    # Get total count efficiently
-    total = db.query(func.count(Post.id)).scalar()
-    
-    # Eager load relationships but DEFER loading attachment data (BLOB)
-    items = db.query(Post).options(
-        joinedload(Post.attachments).defer(Attachment.data),  # Don't load BLOB data
-        joinedload(Post.reactions),
-        joinedload(Post.views),
-    ).order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
-    
-    # Get aggregate counts for all posts in ONE query each
-    post_ids = [p.id for p in items]
-    
-    views_counts = dict(
-        db.query(PostView.post_id, func.count(PostView.id))
-        .filter(PostView.post_id.in_(post_ids))
-        .group_by(PostView.post_id)
-        .all()
-    ) if post_ids else {}
-    
-    replies_counts = dict(
-        db.query(Reply.post_id, func.count(Reply.id))
-        .filter(Reply.post_id.in_(post_ids))
-        .group_by(Reply.post_id)
-        .all()
-    ) if post_ids else {}
-    
-    shares_counts = dict(
-        db.query(Share.post_id, func.count(Share.id))
-        .filter(Share.post_id.in_(post_ids))
-        .group_by(Share.post_id)
-        .all()
-    ) if post_ids else {}
-    
+async def list_posts(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    # Counts are maintained on the post row itself (see Post.views_count, plus views
+    # still sitting in app.view_buffer); the overall total rides along as a window column, so page + total is ONE round-trip
+    stmt = (
+        select(
+            Post,
+            func.count().over().label("total"),
+        )
+        .options(*POST_COLLECTION_OPTIONS)
+        .order_by(Post.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).all()
+
+    if rows:
+        total = rows[0].total
+    elif skip:
+        # page past the end: the window column has no row to ride on
+        total = await db.scalar(select(func.count(Post.id)))
+    else:
+        total = 0
+
     # Build response
     posts_out = []
-    for p in items:
+    for p, _ in rows:
         # build a de-duplicated list of users who liked this post (preserve last like ordering)
-        _liked_users: list[str] = []
+        _liked: dict[str, None] = {}
         for r in p.reactions:
             if (r.reaction or '').lower() == 'like':
-                u = r.user
-                if u in _liked_users:
-                    _liked_users.remove(u)
-                _liked_users.append(u)
-
-        liked_users = _liked_users
-        # build a de-duplicated list of users who viewed this post (preserve last view ordering)
-        _seen_by: list[str] = []
-        for v in sorted(p.views, key=lambda x: getattr(x, 'viewed_at', None) or x.id):
-            u = v.user
-            if u in _seen_by:
-                _seen_by.remove(u)
-            _seen_by.append(u)
-        seen_by = _seen_by
+                _liked.pop(r.user, None)
+                _liked[r.user] = None
+
+        liked_users = list(_liked)
+        # build a de-duplicated list of users who viewed this post (preserve last view ordering;
+        # views are loaded ordered by viewed_at, and views still buffered are newer)
+        _seen: dict[str, None] = {}
+        for user in [*(v.user for v in p.views), *view_buffer.pending_viewers(p.id)]:
+            _seen.pop(user, None)
+            _seen[user] = None
+        seen_by = list(_seen)
 
         posts_out.append(PostResponse(
             id=p.id,
@@ -141,9 +176,9 @@ def list_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
             updated_at=p.updated_at,
             attachments=[AttachmentMeta.from_orm(a) for a in p.attachments],
             reactions=[ReactionSchema.from_orm(r) for r in p.reactions],
-            views_count=views_counts.get(p.id, 0),
-            replies_count=replies_counts.get(p.id, 0),
-            shares_count=shares_counts.get(p.id, 0),
+            views_count=p.views_count + view_buffer.pending_views(p.id),
+            replies_count=p.replies_count,
+            shares_count=p.shares_count,
             liked_users=liked_users,
             seen_by=seen_by,
         ))
@@ -152,27 +187,23 @@ def list_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
 
 
 @router.get("/{post_id}", response_model=PostResponse)
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    p = db.query(Post).filter(Post.id == post_id).first()
+async def get_post(post_id: int, db: AsyncSession = Depends(get_db)):
+    p = await _get_post_with_collections(db, post_id)
     if not p:
         raise HTTPException(status_code=404, detail="Post not found")
-    views_count = db.query(PostView).filter(PostView.post_id == p.id).count()
     # build a de-duplicated list of users who liked this post (preserve last like ordering)
-    _liked_users: list[str] = []
+    _liked: dict[str, None] = {}
     for r in p.reactions:
         if (r.reaction or '').lower() == 'like':
-            u = r.user
-            if u in _liked_users:
-                _liked_users.remove(u)
-            _liked_users.append(u)
-
-    # build a de-duplicated list of users who viewed this post (preserve last view ordering)
-    _seen_by: list[str] = []
-    for v in sorted(p.views, key=lambda x: getattr(x, 'viewed_at', None) or x.id):
-        u = v.user
-        if u in _seen_by:
-            _seen_by.remove(u)
-        _seen_by.append(u)
+            _liked.pop(r.user, None)
+            _liked[r.user] = None
+
+    # build a de-duplicated list of users who viewed this post (preserve last view ordering;
+    # views are loaded ordered by viewed_at, and views still buffered are newer)
+    _seen: dict[str, None] = {}
+    for user in [*(v.user for v in p.views), *view_buffer.pending_viewers(p.id)]:
+        _seen.pop(user, None)
+        _seen[user] = None
 
     return PostResponse(
         id=p.id,
@@ -184,63 +215,81 @@ def get_post(post_id: int, db: Session = Depends(get_db)):
         updated_at=p.updated_at,
         attachments=[AttachmentMeta.from_orm(a) for a in p.attachments],
         reactions=[ReactionSchema.from_orm(r) for r in p.reactions],
-        views_count=views_count,
-        replies_count=db.query(Reply).filter(Reply.post_id == p.id).count(),
-        shares_count=db.query(Share).filter(Share.post_id == p.id).count(),
-        liked_users=_liked_users,
-        seen_by=_seen_by,
+        views_count=p.views_count + view_buffer.pending_views(p.id),
+        replies_count=p.replies_count,
+        shares_count=p.shares_count,
+        liked_users=list(_liked),
+        seen_by=list(_seen),
     )
 
 
+async def _iter_attachment_data(db: AsyncSession, oid: int, size: int):
+    """Yield the attachment's large object in ATTACHMENT_CHUNK_SIZE slices (never the whole file)"""
+    for offset in range(0, size, ATTACHMENT_CHUNK_SIZE):
+        chunk = await db.scalar(
+            select(func.lo_get(literal(oid, OID), literal(offset, BigInteger), ATTACHMENT_CHUNK_SIZE, type_=LargeBinary))
+        )
+        if not chunk:
+            break
+        yield chunk
+
+
 @router.get("/{post_id}/attachments/{att_id}")
-def get_attachment(post_id: int, att_id: int, db: Session = Depends(get_db)):
-    att = db.query(Attachment).filter(Attachment.id == att_id, Attachment.post_id == post_id).first()
+async def get_attachment(post_id: int, att_id: int, db: AsyncSession = Depends(get_db)):
+    att = await db.scalar(
+        select(Attachment).where(Attachment.id == att_id, Attachment.post_id == post_id)
+    )
     if not att:
         raise HTTPException(status_code=404, detail="Attachment not found")
-    return Response(content=att.data, media_type=att.content_type, headers={"Content-Disposition": f"inline; filename=\"{att.filename}\""})
+    return StreamingResponse(
+        _iter_attachment_data(db, att.data_oid, att.size),
+        media_type=att.content_type,
+        headers={
+            "Content-Disposition": f"inline; filename=\"{att.filename}\"",
+            "Content-Length": str(att.size),
+        },
+    )
 
 
 @router.get("/{post_id}/replies", response_model=List[ReplySchema])
-def list_replies(post_id: int, db: Session = Depends(get_db)):
-    p = db.query(Post).filter(Post.id == post_id).first()
+async def list_replies(post_id: int, db: AsyncSession = Depends(get_db)):
+    p = await _get_post(db, post_id)
     if not p:
         raise HTTPException(status_code=404, detail="Post not found")
-    return [ReplySchema.from_orm(r) for r in p.replies]
+    replies = await db.scalars(select(Reply).where(Reply.post_id == post_id))
+    return [ReplySchema.from_orm(r) for r in replies]
 
 
 @router.post("/{post_id}/replies", response_model=ReplySchema, status_code=status.HTTP_201_CREATED)
-def add_reply(post_id: int, user: str = Form(...), content: str = Form(...), db: Session = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
-    p = db.query(Post).filter(Post.id == post_id).first()
-    if not p:
+async def add_reply(post_id: int, user: str = Form(...), content: str = Form(...), db: AsyncSession = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    # no existence check up front: the post_id foreign key rejects unknown posts
+    try:
+        r = await db.scalar(
+            insert(Reply).values(post_id=post_id, user=user, content=content).returning(Reply)
+        )
+    except IntegrityError as exc:
+        if not _is_missing_post(exc):
+            raise
         raise HTTPException(status_code=404, detail="Post not found")
-    r = Reply(post_id=post_id, user=user, content=content)
-    db.add(r)
-    db.commit()
-    db.refresh(r)
+    await db.commit()
 
-    try:
-        token = credentials.credentials if credentials else None
-        print(f"[posts.add_reply] Authorization Bearer token: {token}")
-    except Exception:
-        pass
+    logger.debug("add_reply: bearer token %s", "present" if credentials else "absent")
     return ReplySchema.from_orm(r)
 
 
 @router.post("/{post_id}/shares", response_model=ShareSchema, status_code=status.HTTP_201_CREATED)
-def add_share(post_id: int, user: str = Form(...), platform: Optional[str] = Form(None), db: Session = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
-    p = db.query(Post).filter(Post.id == post_id).first()
-    if not p:
+async def add_share(post_id: int, user: str = Form(...), platform: Optional[str] = Form(None), db: AsyncSession = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    try:
+        s = await db.scalar(
+            insert(Share).values(post_id=post_id, user=user, platform=platform).returning(Share)
+        )
+    except IntegrityError as exc:
+        if not _is_missing_post(exc):
+            raise
         raise HTTPException(status_code=404, detail="Post not found")
-    s = Share(post_id=post_id, user=user, platform=platform)
-    db.add(s)
-    db.commit()
-    db.refresh(s)
+    await db.commit()
 
-    try:
-        token = credentials.credentials if credentials else None
-        print(f"[posts.add_share] Authorization Bearer token: {token}")
-    except Exception:
-        pass
+    logger.debug("add_share: bearer token %s", "present" if credentials else "absent")
     return ShareSchema.from_orm(s)
 
 
@@ -250,9 +299,10 @@ async def update_post(post_id: int,
     description: Optional[str] = Form(None),
     announce_type: Optional[str] = Form(None),
     files: Optional[List[UploadFile]] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
-    p = db.query(Post).filter(Post.id == post_id).first()
+    # attachments/reactions are loaded up front so the response needs no reload after the write
+    p = await _get_post_with_collections(db, post_id, POST_EDIT_OPTIONS)
     if not p:
         raise HTTPException(status_code=404, detail="Post not found")
     if title is not None:
@@ -261,30 +311,12 @@ async def update_post(post_id: int,
         p.description = description
     if announce_type is not None:
         p.announce_type = announce_type
-    db.add(p)
-    db.commit()
     # add files if provided
-    if files:
-        for f in files:
-            content = await f.read()
-            att = Attachment(
-                post_id=p.id,
-                filename=f.filename,
-                content_type=f.content_type or 'application/octet-stream',
-                size=len(content),
-                is_image=(f.content_type or '').startswith('image/'),
-                data=content,
-            )
-            db.add(att)
-        db.commit()
-    db.refresh(p)
-    views_count = db.query(PostView).filter(PostView.post_id == p.id).count()
+    new_attachments = [await _add_attachment(db, p.id, f) for f in files or []]
+    # updated_at comes back from the UPDATE ... RETURNING (eager_defaults)
+    await db.commit()
 
-    try:
-        token = credentials.credentials if credentials else None
-        print(f"[posts.update_post] Authorization Bearer token: {token}")
-    except Exception:
-        pass
+    logger.debug("update_post: bearer token %s", "present" if credentials else "absent")
     return PostResponse(
         id=p.id,
         title=p.title,
@@ -293,55 +325,69 @@ async def update_post(post_id: int,
         announce_type=p.announce_type,
         created_at=p.created_at,
         updated_at=p.updated_at,
-        attachments=[AttachmentMeta.from_orm(a) for a in p.attachments],
+        attachments=[AttachmentMeta.from_orm(a) for a in [*p.attachments, *new_attachments]],
         reactions=[ReactionSchema.from_orm(r) for r in p.reactions],
-        views_count=views_count,
+        views_count=p.views_count + view_buffer.pending_views(p.id),
     )
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(post_id: int, db: Session = Depends(get_db)):
-    p = db.query(Post).filter(Post.id == post_id).first()
+async def delete_post(post_id: int, db: AsyncSession = Depends(get_db)):
+    p = await _get_post(db, post_id)
     if not p:
         raise HTTPException(status_code=404, detail="Post not found")
-    db.delete(p)
-    db.commit()
+    await db.delete(p)
+    await db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.post("/{post_id}/reactions", response_model=ReactionSchema, status_code=status.HTTP_201_CREATED)
-def add_reaction(post_id: int, user: str = Form(...), reaction: str = Form(...), db: Session = Depends(get_db)):
-    p = db.query(Post).filter(Post.id == post_id).first()
-    if not p:
-        raise HTTPException(status_code=404, detail="Post not found")
-    # Prevent duplicate identical reactions by the same user on the same post
-    existing = db.query(Reaction).filter(
-        Reaction.post_id == post_id,
-        Reaction.user == user,
-        func.lower(Reaction.reaction) == (reaction or '').lower()
-    ).first()
-
-    if existing:
+async def add_reaction(post_id: int, user: str = Form(...), reaction: str = Form(...), db: AsyncSession = Depends(get_db)):
+    # Prevent duplicate identical reactions by the same user on the same post:
+    # the unique (post_id, user, lower(reaction)) index turns a duplicate into a no-op,
+    # and the post_id foreign key rejects unknown posts
+    stmt = (
+        insert(Reaction)
+        .values(post_id=post_id, user=user, reaction=reaction)
+        .on_conflict_do_nothing(index_elements=REACTION_UNIQUE_ELEMENTS)
+        .returning(Reaction)
+    )
+    # A concurrent remove_reaction can delete the conflicting row before it is read
+    # back below; the insert is then retried once
+    for _ in range(2):
+        try:
+            r = await db.scalar(stmt)
+        except IntegrityError as exc:
+            if not _is_missing_post(exc):
+                raise
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        if r is not None:
+            await db.commit()
+            # Log token for testing
+            # (no credentials param here currently; can be added if needed)
+            return ReactionSchema.from_orm(r)
+
         # Return the existing reaction instead of creating a duplicate
-        return ReactionSchema.from_orm(existing)
+        existing = await db.scalar(select(Reaction).where(
+            Reaction.post_id == post_id,
+            Reaction.user == user,
+            func.lower(Reaction.reaction) == reaction.lower()
+        ))
+        if existing is not None:
+            return ReactionSchema.from_orm(existing)
 
-    r = Reaction(post_id=post_id, user=user, reaction=reaction)
-    db.add(r)
-    db.commit()
-    db.refresh(r)
-    # Log token for testing
-    # (no credentials param here currently; can be added if needed)
-    return ReactionSchema.from_orm(r)
+    raise HTTPException(status_code=409, detail="Reaction was changed concurrently, please retry")
 
 
 @router.delete("/{post_id}/reactions", status_code=status.HTTP_200_OK)
-async def remove_reaction(post_id: int, request: Request, db: Session = Depends(get_db)):
+async def remove_reaction(post_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """Remove a reaction (e.g., unlike) by post, user and reaction type.
 
     Accepts parameters as form-data or as query parameters to accommodate
     DELETE requests from browsers/clients that send query params.
     """
-    p = db.query(Post).filter(Post.id == post_id).first()
+    p = await _get_post(db, post_id)
     if not p:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -358,33 +404,30 @@ async def remove_reaction(post_id: int, request: Request, db: Session = Depends(
     if not user or not reaction:
         raise HTTPException(status_code=400, detail="Missing 'user' or 'reaction' parameter")
 
-    existing = db.query(Reaction).filter(
-        Reaction.post_id == post_id,
-        Reaction.user == user,
-        func.lower(Reaction.reaction) == (reaction or '').lower()
-    ).all()
-
-    if not existing:
+    # delete all matching reactions (defensive)
+    deleted = (await db.scalars(
+        delete(Reaction)
+        .where(
+            Reaction.post_id == post_id,
+            Reaction.user == user,
+            func.lower(Reaction.reaction) == reaction.lower()
+        )
+        .returning(Reaction.id)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+    if not deleted:
         return {"status": "not_found"}
 
-    # delete all matching reactions (defensive)
-    for r in existing:
-        db.delete(r)
-    db.commit()
-    return {"status": "deleted", "deleted": len(existing)}
+    await db.commit()
+    return {"status": "deleted", "deleted": len(deleted)}
 
 
 @router.post("/{post_id}/views", status_code=status.HTTP_201_CREATED)
-def add_view(post_id: int, user: str = Form(...), db: Session = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
-    p = db.query(Post).filter(Post.id == post_id).first()
-    if not p:
+async def add_view(post_id: int, user: str = Form(..., max_length=200), db: AsyncSession = Depends(get_db), credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    if await db.scalar(select(Post.id).where(Post.id == post_id)) is None:
         raise HTTPException(status_code=404, detail="Post not found")
-    v = PostView(post_id=post_id, user=user)
-    db.add(v)
-    db.commit()
-    try:
-        token = credentials.credentials if credentials else None
-        print(f"[posts.add_view] Authorization Bearer token: {token}")
-    except Exception:
-        pass
+    # buffered and written to post_views in batches, or inline on Vercel (see app.view_buffer)
+    await view_buffer.record_view(db, post_id, user)
+    logger.debug("add_view: bearer token %s", "present" if credentials else "absent")
     return {"status": "ok"}
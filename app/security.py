@@ -1,7 +1,13 @@
+import hashlib
+import threading
+import time
 import httpx
+from cachetools import TTLCache
 from jose import jwt
-from datetime import datetime, timedelta
-from typing import Dict
+from datetime import timedelta
+from typing import Dict, Optional
+
+from app.schemas.auth import UserResponse
 
 AZURE_TENANT_ID = "af6d0c9d-3447-4207-8e1a-936fe897c7a3"
 AZURE_CLIENT_ID = "53435daa-f8e8-4099-8ae8-51ab103eeb90"
@@ -11,26 +17,82 @@ JWKS_URL = f"https://login.microsoftonline.com/{AZURE_TENANT_ID}/discovery/v2.0/
 
 INTRANET_SECRET_KEY = "CHANGE_THIS_SECRET"
 ALGORITHM = "HS256"
+# HMAC key bytes, encoded once rather than on every sign/verify
+_SIGNING_KEY = INTRANET_SECRET_KEY.encode()
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Microsoft signing keys by kid, refreshed hourly or when an unknown kid shows up
+JWKS_CACHE_TTL_SECONDS = 3600
+# an unknown kid triggers at most one refetch per this interval
+JWKS_MIN_REFRESH_SECONDS = 60
+_JWKS_CACHE: Dict[str, Dict] = {}
+_JWKS_EXPIRES_AT: float = 0
+_JWKS_FETCHED_AT: float = 0
 
-async def validate_microsoft_id_token(id_token: str) -> Dict:
-    """Validate Microsoft ID token and return claims"""
+# Shared client so JWKS refreshes reuse the pooled TLS connection
+_HTTP = httpx.AsyncClient(timeout=10.0)
+
+
+async def close_http_client() -> None:
+    """Close the shared JWKS client (call on shutdown)"""
+    await _HTTP.aclose()
+
+# Short-lived caches for authenticated requests. The TTL bounds how long a
+# revoked token or a stale user row can keep being served.
+AUTH_CACHE_TTL_SECONDS = 5
+AUTH_CACHE_MAXSIZE = 10_000
+
+# blake2b(token) -> (user_id, exp)
+_verify_cache: TTLCache = TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+# user_id -> UserResponse snapshot (never a live ORM instance, which belongs to one session)
+_user_cache: TTLCache = TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+# TTLCache isn't thread-safe. Today every caller runs on the event loop, but the
+# lock keeps these helpers safe if a sync (threadpool) route ever uses them; it is
+# never held across an await.
+_cache_lock = threading.Lock()
+
+
+async def _refresh_jwks() -> None:
+    """Fetch Microsoft's signing keys and rebuild the kid -> key cache"""
+    global _JWKS_EXPIRES_AT, _JWKS_FETCHED_AT
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(JWKS_URL, timeout=10.0)
-            response.raise_for_status()
-            jwks = response.json()
+        response = await _HTTP.get(JWKS_URL)
+        response.raise_for_status()
+        jwks = response.json()
     except httpx.HTTPError as e:
         raise ValueError(f"Failed to fetch JWKS from {JWKS_URL}: {str(e)}")
     except Exception as e:
         raise ValueError(f"Failed to parse JWKS response: {str(e)}")
 
     try:
-        unverified_header = jwt.get_unverified_header(id_token)
-        key = next(k for k in jwks["keys"] if k["kid"] == unverified_header["kid"])
-    except (KeyError, StopIteration) as e:
+        keys = {k["kid"]: k for k in jwks["keys"]}
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Failed to parse JWKS response: {str(e)}")
+
+    _JWKS_CACHE.clear()
+    _JWKS_CACHE.update(keys)
+    _JWKS_FETCHED_AT = time.monotonic()
+    _JWKS_EXPIRES_AT = _JWKS_FETCHED_AT + JWKS_CACHE_TTL_SECONDS
+
+
+async def validate_microsoft_id_token(id_token: str) -> Dict:
+    """Validate Microsoft ID token and return claims"""
+    try:
+        kid = jwt.get_unverified_header(id_token)["kid"]
+    except KeyError as e:
+        raise ValueError(f"Could not find key in JWKS: {str(e)}")
+
+    # refetch when the cache is stale or the key was rotated in since
+    now = time.monotonic()
+    if now >= _JWKS_EXPIRES_AT or (
+        kid not in _JWKS_CACHE and now - _JWKS_FETCHED_AT >= JWKS_MIN_REFRESH_SECONDS
+    ):
+        await _refresh_jwks()
+
+    try:
+        key = _JWKS_CACHE[kid]
+    except KeyError as e:
         raise ValueError(f"Could not find key in JWKS: {str(e)}")
 
     payload = jwt.decode(
@@ -46,10 +108,8 @@ async def validate_microsoft_id_token(id_token: str) -> Dict:
 
 def create_access_token(data: Dict, expires_delta: timedelta):
     """Create JWT access token"""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, INTRANET_SECRET_KEY, algorithm=ALGORITHM)
+    exp = int(time.time()) + int(expires_delta.total_seconds())
+    return jwt.encode({**data, "exp": exp}, _SIGNING_KEY, algorithm=ALGORITHM)
 
 
 def create_tokens(user_id: str):
@@ -65,3 +125,45 @@ def create_tokens(user_id: str):
     )
 
     return access_token, refresh_token
+
+
+def decode_access_token(token: str) -> str:
+    """Verify an Intranet JWT and return its subject, skipping the decode on cache hits"""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _cache_lock:
+        cached = _verify_cache.get(key)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > time.time():
+            return user_id
+
+    payload = jwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
+    user_id = payload.get("sub")
+    if not user_id:
+        raise ValueError("Token has no subject")
+
+    exp = payload.get("exp")
+    if exp is not None:
+        with _cache_lock:
+            _verify_cache[key] = (user_id, exp)
+    return user_id
+
+
+def get_cached_user(user_id: str) -> Optional[UserResponse]:
+    """Return the cached user snapshot for user_id, if any"""
+    with _cache_lock:
+        return _user_cache.get(user_id)
+
+
+def cache_user(user) -> UserResponse:
+    """Cache a snapshot of a loaded User so the next requests skip the lookup"""
+    snapshot = UserResponse(id=user.id, email=user.email, name=user.name)
+    with _cache_lock:
+        _user_cache[snapshot.id] = snapshot
+    return snapshot
+
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Drop a cached User (e.g. after sign-in refreshed its row)"""
+    with _cache_lock:
+        _user_cache.pop(user_id, None)
@@ -0,0 +1,208 @@
+"""In-process buffer for post views.
+
+Views are the most frequent write and don't need to be durable the moment
+they happen, so add_view only queues them here. A background task writes
+the queue to post_views with a single INSERT every FLUSH_INTERVAL_SECONDS
+(or as soon as FLUSH_MAX_ITEMS are waiting). Views still queued when the
+process dies are lost.
+
+On Vercel the function instance is frozen between invocations and may be
+recycled without running shutdown hooks, so there record_view writes each
+view inline instead of buffering it.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Integer, String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import DBAPIError, DataError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal
+from app.models.post import PostView
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 2
+FLUSH_MAX_ITEMS = 500
+# Views whose write fails transiently go back in the queue; past this many
+# waiting, the oldest are dropped so an outage can't grow the queue without bound
+MAX_PENDING_ITEMS = 50_000
+# Failures worth retrying: the database was unreachable or too slow, not the data
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, OSError)
+# SQLSTATE classes for rows Postgres will never accept (data exception, integrity
+# violation); asyncpg doesn't map all of them to DataError/IntegrityError
+REJECTED_SQLSTATE_CLASSES = ("22", "23")
+# Serverless instances can't be relied on to flush later
+WRITE_INLINE = bool(os.getenv("VERCEL"))
+
+# Views of posts deleted before the flush are dropped by the join
+_INSERT_VIEWS = text(
+    'INSERT INTO post_views (post_id, "user", viewed_at) '
+    'SELECT v.post_id, v."user", v.viewed_at '
+    'FROM unnest(:post_ids, :users, :viewed_ats) AS v(post_id, "user", viewed_at) '
+    'JOIN posts ON posts.id = v.post_id'
+).bindparams(
+    bindparam("post_ids", type_=ARRAY(Integer)),
+    bindparam("users", type_=ARRAY(String)),
+    bindparam("viewed_ats", type_=ARRAY(DateTime)),
+)
+
+_pending: List[Tuple[int, str, datetime]] = []
+# post_id -> viewers (oldest first) queued or being flushed, so counts don't dip mid-flush
+_pending_viewers: Dict[int, List[str]] = {}
+_flusher: Optional[asyncio.Task] = None
+_wake: Optional[asyncio.Event] = None
+_stopping = False
+
+
+async def record_view(db: AsyncSession, post_id: int, user: str) -> None:
+    """Record a view: inline on serverless, otherwise through the buffer"""
+    if WRITE_INLINE:
+        db.add(PostView(post_id=post_id, user=user))
+        await db.commit()
+    else:
+        add_view(post_id, user)
+
+
+def add_view(post_id: int, user: str) -> None:
+    """Queue a view; it reaches the database on the next flush"""
+    _pending.append((post_id, user, datetime.utcnow()))
+    _pending_viewers.setdefault(post_id, []).append(user)
+    _ensure_flusher()
+    if len(_pending) >= FLUSH_MAX_ITEMS:
+        _wake.set()
+
+
+def pending_views(post_id: int) -> int:
+    """Views of post_id not yet committed to post_views"""
+    return len(_pending_viewers.get(post_id, ()))
+
+
+def pending_viewers(post_id: int) -> List[str]:
+    """Users whose views of post_id are not yet committed, oldest first"""
+    return list(_pending_viewers.get(post_id, ()))
+
+
+def _release(items: List[Tuple[int, str, datetime]]) -> None:
+    """Forget items that were written (or dropped); each is its post's oldest entry"""
+    for post_id, _, _ in items:
+        viewers = _pending_viewers.get(post_id)
+        if viewers:
+            del viewers[0]
+            if not viewers:
+                del _pending_viewers[post_id]
+
+
+def _requeue(batch: List[Tuple[int, str, datetime]]) -> None:
+    """Put a failed batch back at the front of the queue"""
+    global _pending
+    _pending = batch + _pending
+    overflow = len(_pending) - MAX_PENDING_ITEMS
+    if overflow > 0:
+        logger.error("post view buffer full, dropping %d oldest views", overflow)
+        _release(_pending[:overflow])
+        del _pending[:overflow]
+
+
+def _is_rejected_data(exc: DBAPIError) -> bool:
+    """True when the database refused the rows themselves (retrying can't help)"""
+    if isinstance(exc, (DataError, IntegrityError)):
+        return True
+    return (getattr(exc.orig, "pgcode", None) or "")[:2] in REJECTED_SQLSTATE_CLASSES
+
+
+async def _write(rows: List[Tuple[int, str, datetime]]) -> None:
+    post_ids, users, viewed_ats = (list(col) for col in zip(*rows))
+    async with SessionLocal() as db:
+        await db.execute(_INSERT_VIEWS, {"post_ids": post_ids, "users": users, "viewed_ats": viewed_ats})
+        await db.commit()
+        # no await between the commit and this, so readers never count a view twice
+        _release(rows)
+
+
+async def flush() -> None:
+    """Write all queued views in one statement.
+
+    If the database rejects the batch's data, the batch is split in halves
+    until the offending rows are isolated and dropped, so one bad row can't
+    hold back every other view. Only connection/timeout failures put views
+    back in the queue.
+    """
+    global _pending
+    if not _pending:
+        return
+    todo = [_pending]
+    _pending = []
+    rows: List[Tuple[int, str, datetime]] = []
+    try:
+        while todo:
+            rows = todo.pop()
+            try:
+                await _write(rows)
+            except DBAPIError as exc:
+                if not _is_rejected_data(exc):
+                    raise
+                if len(rows) == 1:
+                    logger.exception("dropping unwritable post view of post %s", rows[0][0])
+                    _release(rows)
+                else:
+                    mid = len(rows) // 2
+                    todo += [rows[mid:], rows[:mid]]
+            rows = []
+    except TRANSIENT_ERRORS:
+        unwritten = _unwritten(rows, todo)
+        logger.exception("writing %d buffered post views failed, requeued", len(unwritten))
+        _requeue(unwritten)
+    except asyncio.CancelledError:
+        _requeue(_unwritten(rows, todo))
+        raise
+    except Exception:
+        unwritten = _unwritten(rows, todo)
+        logger.exception("dropping %d buffered post views", len(unwritten))
+        _release(unwritten)
+
+
+def _unwritten(rows, todo) -> List[Tuple[int, str, datetime]]:
+    """The current chunk plus the chunks still to write, in queue order"""
+    return rows + [row for chunk in reversed(todo) for row in chunk]
+
+
+async def _run_flusher() -> None:
+    while not _stopping:
+        try:
+            await asyncio.wait_for(_wake.wait(), FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+        await flush()
+
+
+def _ensure_flusher() -> None:
+    """Start the flush loop on the running event loop if it isn't running yet"""
+    global _flusher, _wake
+    loop = asyncio.get_running_loop()
+    if _flusher is None or _flusher.done() or _flusher.get_loop() is not loop:
+        _wake = asyncio.Event()
+        _flusher = loop.create_task(_run_flusher())
+
+
+async def stop() -> None:
+    """Stop the flush loop, letting an in-flight flush finish, and write whatever is still queued"""
+    global _flusher, _stopping
+    if _flusher is not None:
+        if not _flusher.done() and _flusher.get_loop() is asyncio.get_running_loop():
+            _stopping = True
+            _wake.set()
+            try:
+                await _flusher
+            finally:
+                _stopping = False
+        else:
+            # left over from an event loop that is gone; it can't be awaited from here
+            _flusher.cancel()
+        _flusher = None
+    await flush()